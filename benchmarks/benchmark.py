@@ -94,7 +94,7 @@ async def load_tools_from_live(config_path: str) -> list[types.Tool]:
         if failed:
             logger.warning("Failed: %s", ", ".join(failed))
         raw_tools = await upstream.collect_tools()
-        return [tool for _, tool in raw_tools]
+        return [entry.tool for entry in raw_tools]
     finally:
         await upstream.close()
 
@@ -31,11 +31,11 @@ async def _snapshot(config_path: str, output_path: str) -> None:
     raw_tools = await upstream.collect_tools()
 
     snapshot = []
-    for server_name, tool in raw_tools:
+    for entry in raw_tools:
         snapshot.append({
-            "name": tool.name,
-            "description": tool.description or "",
-            "inputSchema": tool.inputSchema,
+            "name": entry.tool.name,
+            "description": entry.tool.description or "",
+            "inputSchema": entry.tool.inputSchema,
         })
 
     out = Path(output_path)
@@ -2,24 +2,38 @@
 
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Literal
 
+import msgspec
 
-@dataclass
-class ServerConfig:
+
+class ServerConfig(msgspec.Struct, frozen=True):
     command: str
-    args: list[str] = field(default_factory=list)
-    env: dict[str, str] = field(default_factory=dict)
+    args: list[str] = []
+    env: dict[str, str] = {}
 
 
-@dataclass
-class SmartMCPConfig:
-    servers: dict[str, ServerConfig]
+class SmartMCPConfig(msgspec.Struct, frozen=True):
+    servers: dict[str, ServerConfig] = msgspec.field(
+        default_factory=dict, name="mcpServers"
+    )
     top_k: int = 5
     embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_backend: Literal["torch", "onnx"] = "torch"
+
+
+def _describe_validation_error(data: bytes, exc: msgspec.ValidationError) -> str:
+    """Name the offending server, since msgspec error paths elide dict keys."""
+    raw = msgspec.json.decode(data)
+    raw_servers = raw.get("mcpServers") if isinstance(raw, dict) else None
+    if isinstance(raw_servers, dict):
+        for name, entry in raw_servers.items():
+            try:
+                msgspec.convert(entry, ServerConfig)
+            except msgspec.ValidationError as server_exc:
+                return f"Server '{name}' is invalid: {server_exc}"
+    return f"Invalid config: {exc}"
 
 
 def load_config(path: str | Path) -> SmartMCPConfig:
@@ -28,24 +42,15 @@ def load_config(path: str | Path) -> SmartMCPConfig:
     if not path.exists():
         raise FileNotFoundError(f"Config file not found: {path}")
 
-    raw: dict[str, Any] = json.loads(path.read_text())
+    data = path.read_bytes()
+    try:
+        config = msgspec.json.decode(data, type=SmartMCPConfig)
+    except msgspec.ValidationError as exc:
+        raise ValueError(_describe_validation_error(data, exc)) from exc
+    except msgspec.DecodeError as exc:
+        raise ValueError(f"Config file is not valid JSON: {exc}") from exc
 
-    raw_servers = raw.get("mcpServers")
-    if not raw_servers or not isinstance(raw_servers, dict):
+    if not config.servers:
         raise ValueError("Config must contain a non-empty 'mcpServers' object")
 
-    servers: dict[str, ServerConfig] = {}
-    for name, entry in raw_servers.items():
-        if "command" not in entry:
-            raise ValueError(f"Server '{name}' is missing required 'command' field")
-        servers[name] = ServerConfig(
-            command=entry["command"],
-            args=entry.get("args", []),
-            env=entry.get("env", {}),
-        )
-
-    return SmartMCPConfig(
-        servers=servers,
-        top_k=raw.get("top_k", 5),
-        embedding_model=raw.get("embedding_model", "all-MiniLM-L6-v2"),
-    )
+    return config
@@ -0,0 +1,60 @@
+"""CPU availability detection for sizing compute thread pools."""
+
+from __future__ import annotations
+
+import math
+import os
+
+
+def usable_cpu_count() -> int | None:
+    """Return the physical cores this process may run on, or None if unknown.
+
+    Counts physical cores within the CPU affinity mask, capped by the cgroup
+    CPU quota. Only implemented for Linux.
+    """
+    if not hasattr(os, "sched_getaffinity"):
+        return None
+    allowed = os.sched_getaffinity(0)
+
+    cores: set[tuple[str, str]] = set()
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpuinfo = f.read()
+    except OSError:
+        cpuinfo = ""
+    for block in cpuinfo.split("\n\n"):
+        fields = {}
+        for line in block.splitlines():
+            key, _, value = line.partition(":")
+            fields[key.strip()] = value.strip()
+        processor = fields.get("processor", "")
+        if processor.isdigit() and int(processor) in allowed:
+            # SMT siblings share a (physical id, core id) pair.
+            cores.add((fields.get("physical id", ""), fields.get("core id", processor)))
+    cpus = len(cores) or len(allowed)
+
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, quota)
+    return max(1, cpus)
+
+
+def cgroup_cpu_quota() -> int | None:
+    """Return the cgroup CPU quota rounded up to whole CPUs, if one is set."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota = f.read().strip()
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = f.read().strip()
+        except OSError:
+            return None
+    if quota in ("max", "-1"):
+        return None
+    try:
+        return max(1, math.ceil(int(quota) / int(period)))
+    except (ValueError, ZeroDivisionError):
+        return None
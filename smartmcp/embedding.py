@@ -1,16 +1,131 @@
-"""Embedding and FAISS index for semantic tool search."""
+"""Embedding index for semantic tool search."""
 
 from __future__ import annotations
 
+import functools
+import importlib.util
+import itertools
 import logging
+import os
+import threading
+from collections import OrderedDict
 
-import faiss
+import anyio
 import numpy as np
+import torch
 from mcp import types
 from sentence_transformers import SentenceTransformer
 
+from smartmcp.cpu import usable_cpu_count
+
 logger = logging.getLogger(__name__)
 
+# Tool texts are short, so large batches fit comfortably on a GPU; on CPU
+# larger batches stop paying off and only increase padding waste.
+_GPU_BATCH_SIZE = 1024
+_CPU_BATCH_SIZE = 32
+
+# Agents often repeat queries within a session; cache their embeddings so a
+# repeat skips the model forward pass entirely.
+_QUERY_CACHE_SIZE = 512
+
+# Concurrent search_tools calls arriving within this window share a single
+# batched forward pass instead of each running a batch of one.
+_QUERY_BATCH_WINDOW_SECONDS = 0.005
+
+# Serializes encode() calls across threads. Module-level because _load_model
+# shares one model instance between every EmbeddingIndex that uses it.
+_ENCODE_LOCK = threading.Lock()
+
+_UNDERSCORE_TABLE = str.maketrans({"_": " "})
+
+
+# Recorded when this module is imported, so only torch.set_num_threads calls
+# made after that point can be told apart from torch's default. A host that
+# sets the count earlier should use OMP_NUM_THREADS or MKL_NUM_THREADS instead.
+_TORCH_DEFAULT_THREADS = torch.get_num_threads()
+
+
+@functools.cache
+def _configure_torch_threads() -> None:
+    """Size torch's intra-op pool to the CPUs this process can actually use.
+
+    torch defaults to the host's physical core count, which oversubscribes
+    containers limited by CPU affinity or a CFS quota. Runs once, before the
+    first torch model loads, and leaves torch alone if OMP_NUM_THREADS or
+    MKL_NUM_THREADS is set or the thread count was changed after
+    ``smartmcp.embedding`` was imported. A count set before that import is
+    indistinguishable from torch's default and will be overridden.
+    """
+    if "OMP_NUM_THREADS" in os.environ or "MKL_NUM_THREADS" in os.environ:
+        return
+    if torch.get_num_threads() != _TORCH_DEFAULT_THREADS:
+        return
+    cpus = usable_cpu_count()
+    if cpus is None or cpus == _TORCH_DEFAULT_THREADS:
+        return
+    torch.set_num_threads(cpus)
+    logger.info("Set torch intra-op threads to %d (was %d)", cpus, _TORCH_DEFAULT_THREADS)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_model(model_name: str, backend: str = "torch") -> SentenceTransformer:
+    """Load a sentence-transformers model once per process and reuse it."""
+    if backend == "onnx":
+        return SentenceTransformer(model_name, backend="onnx")
+    _configure_torch_threads()
+    return SentenceTransformer(model_name)
+
+
+def _get_model(model_name: str, backend: str) -> SentenceTransformer:
+    """Return the shared model for ``backend``, falling back to torch.
+
+    The ``"onnx"`` backend runs inference through ONNX Runtime, exporting the
+    model on first use. It needs the optional ``onnx`` extra; without it the
+    torch backend is used instead. The fallback happens outside the cached
+    loader so a torch model is only ever cached under the torch key.
+    """
+    if backend == "onnx":
+        if not _onnx_available():
+            logger.warning(
+                "ONNX backend requires optimum and onnxruntime; falling back to "
+                "torch. Install smartmcp-router[onnx] to enable it."
+            )
+        else:
+            try:
+                return _load_model(model_name, "onnx")
+            except Exception as exc:
+                # sentence-transformers reports backend problems with a bare
+                # Exception, and older releases reject the backend argument.
+                logger.warning(
+                    "ONNX backend failed to load (%s); falling back to torch.", exc
+                )
+    return _load_model(model_name, "torch")
+
+
+def _onnx_available() -> bool:
+    """Return whether the optional ONNX Runtime backend can be imported."""
+    return all(
+        importlib.util.find_spec(name) is not None
+        for name in ("optimum", "onnxruntime")
+    )
+
+
+def _top_k_inner_product(
+    matrix: np.ndarray, query: np.ndarray, k: int
+) -> tuple[list[int], list[float]]:
+    """Return indices and scores of the ``k`` rows with the largest inner product.
+
+    Results are ordered by descending inner product and returned as plain
+    Python lists, so callers avoid per-element numpy scalar conversions.
+    """
+    scores = matrix @ query
+    k = min(k, scores.shape[0])
+    # Partition out the top-k candidates in O(n), then sort only those.
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top.tolist(), scores[top].tolist()
+
 
 def tool_to_text(tool: types.Tool) -> str:
     """Convert a tool schema into a single text string for embedding.
@@ -18,62 +133,194 @@ def tool_to_text(tool: types.Tool) -> str:
     Concatenates the tool name, description, and parameter names/descriptions
     to give the embedding model maximum semantic signal.
     """
-    parts = [tool.name.replace("__", " ").replace("_", " ")]
+    props = tool.inputSchema.get("properties")
+    if not isinstance(props, dict):
+        props = {}
+    param_texts = (
+        f"{param_name.translate(_UNDERSCORE_TABLE)}: {param_info['description']}"
+        if isinstance(param_info, dict) and param_info.get("description")
+        else param_name.translate(_UNDERSCORE_TABLE)
+        for param_name, param_info in props.items()
+    )
+    return " ".join(
+        itertools.chain(
+            # "__" becomes two spaces, which tokenizers treat like one.
+            (tool.name.translate(_UNDERSCORE_TABLE),),
+            (tool.description,) if tool.description else (),
+            param_texts,
+        )
+    )
 
-    if tool.description:
-        parts.append(tool.description)
 
-    props = tool.inputSchema.get("properties", {})
-    for param_name, param_info in props.items():
-        param_text = param_name.replace("_", " ")
-        if isinstance(param_info, dict) and param_info.get("description"):
-            param_text += f": {param_info['description']}"
-        parts.append(param_text)
+class _QueryBatch:
+    """Queries waiting to be encoded together in one forward pass."""
 
-    return " ".join(parts)
+    def __init__(self, query: str) -> None:
+        self.queries = [query]
+        self.done = anyio.Event()
+        self.embeddings: dict[str, np.ndarray] = {}
+        self.error: Exception | None = None
 
 
 class EmbeddingIndex:
     """Loads a sentence-transformers model for tool embedding and search."""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2") -> None:
-        logger.info("Loading embedding model: %s", model_name)
-        self._model = SentenceTransformer(model_name)
-        logger.info("Embedding model loaded")
-        self._index: faiss.IndexFlatIP | None = None
+    def __init__(
+        self, model_name: str = "all-MiniLM-L6-v2", backend: str = "torch"
+    ) -> None:
+        logger.info("Loading embedding model: %s (%s backend)", model_name, backend)
+        self._model = _get_model(model_name, backend)
+        self._batch_size = (
+            _GPU_BATCH_SIZE if self._model.device.type == "cuda" else _CPU_BATCH_SIZE
+        )
+        logger.info("Embedding model loaded on %s", self._model.device)
+        self._matrix: np.ndarray | None = None
         self._tools: list[types.Tool] = []
+        self._query_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._pending_batch: _QueryBatch | None = None
 
     def build_index(self, tools: list[types.Tool]) -> None:
-        """Embed all tools and build a FAISS inner-product index."""
+        """Embed all tools into a normalized (n_tools, dim) matrix.
+
+        Tool catalogs are small enough that a brute-force matrix-vector
+        product beats a FAISS index, whose per-call overhead dominates here.
+        """
         self._tools = list(tools)
         texts = [tool_to_text(t) for t in self._tools]
-        embeddings = self._model.encode(texts, convert_to_numpy=True)
-        embeddings = embeddings.astype(np.float32)
-        faiss.normalize_L2(embeddings)
-        dimension = embeddings.shape[1]
-        self._index = faiss.IndexFlatIP(dimension)
-        self._index.add(embeddings)
-        logger.info("Built FAISS index with %d tools (dim=%d)", len(self._tools), dimension)
+
+        # encode() already length-sorts inputs internally to minimize padding.
+        with _ENCODE_LOCK:
+            embeddings = self._model.encode(
+                texts,
+                batch_size=self._batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+        # Row-major float32 lets the search sgemv stream each tool's vector
+        # sequentially; batched queries can use ``Q @ matrix.T``, which BLAS
+        # handles as a transposed sgemm without copying. encode() normally
+        # returns exactly this, in which case no copy is made.
+        self._matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        logger.info(
+            "Built embedding index with %d tools (dim=%d)",
+            len(self._tools),
+            self._matrix.shape[1],
+        )
 
     def search(self, query: str, top_k: int = 3) -> list[tuple[types.Tool, float]]:
         """Search the index for tools most relevant to the query.
 
         Returns a list of (tool, score) tuples, highest score first.
         """
-        if self._index is None or not self._tools:
+        if self._matrix is None or not self._tools or top_k < 1:
+            return []
+
+        query_embedding = self._cached_query(query)
+        if query_embedding is None:
+            query_embedding = self._cache_query(query, self._encode_queries([query])[0])
+        return self._rank(query, query_embedding, top_k)
+
+    async def search_async(
+        self, query: str, top_k: int = 3
+    ) -> list[tuple[types.Tool, float]]:
+        """Like ``search``, but coalesces concurrent queries into one encode.
+
+        The model runs in a worker thread so the event loop stays responsive.
+        """
+        if self._matrix is None or not self._tools or top_k < 1:
             return []
 
-        top_k = min(top_k, len(self._tools))
-        query_embedding = self._model.encode([query], convert_to_numpy=True)
-        query_embedding = query_embedding.astype(np.float32)
-        faiss.normalize_L2(query_embedding)
-        scores, indices = self._index.search(query_embedding, top_k)
+        query_embedding = await self.encode_query(query)
+        return self._rank(query, query_embedding, top_k)
+
+    async def encode_query(self, query: str) -> np.ndarray:
+        """Return the normalized embedding for a query.
+
+        The first uncached query opens a short batching window; queries that
+        arrive before it closes are encoded with it in a single model call.
+        """
+        cached = self._cached_query(query)
+        if cached is not None:
+            return cached
+
+        batch = self._pending_batch
+        if batch is not None:
+            if query not in batch.queries:
+                batch.queries.append(query)
+            await batch.done.wait()
+            if batch.error is not None:
+                raise RuntimeError(
+                    f"Query encoding failed: {batch.error}"
+                ) from batch.error
+            embedding = batch.embeddings.get(query)
+            if embedding is None:
+                # The leader stopped before encoding; start a fresh batch.
+                return await self.encode_query(query)
+            return embedding
 
-        results: list[tuple[types.Tool, float]] = []
-        for i, idx in enumerate(indices[0]):
-            if idx < 0:
-                continue
-            results.append((self._tools[idx], float(scores[0][i])))
+        batch = self._pending_batch = _QueryBatch(query)
+        try:
+            # Other requests may be waiting on this batch, so cancelling the
+            # request that opened it must not abandon the encode.
+            with anyio.CancelScope(shield=True):
+                await anyio.sleep(_QUERY_BATCH_WINDOW_SECONDS)
+                self._pending_batch = None
+                queries = batch.queries
+                embeddings = await anyio.to_thread.run_sync(
+                    self._encode_queries, queries
+                )
+            batch.embeddings = {
+                q: self._cache_query(q, embedding)
+                for q, embedding in zip(queries, embeddings)
+            }
+        except Exception as exc:
+            batch.error = exc
+            raise
+        finally:
+            if self._pending_batch is batch:
+                self._pending_batch = None
+            batch.done.set()
 
+        if len(queries) > 1:
+            logger.info("Encoded %d coalesced queries in one batch", len(queries))
+        return batch.embeddings[query]
+
+    def _rank(
+        self, query: str, query_embedding: np.ndarray, top_k: int
+    ) -> list[tuple[types.Tool, float]]:
+        """Score all tools against an encoded query and return the top_k."""
+        assert self._matrix is not None
+        indices, scores = _top_k_inner_product(self._matrix, query_embedding, top_k)
+
+        tools = self._tools
+        results = [(tools[i], score) for i, score in zip(indices, scores)]
         logger.info("Search '%s' returned %d result(s)", query, len(results))
         return results
+
+    def _encode_queries(self, queries: list[str]) -> np.ndarray:
+        """Encode queries into normalized float32 rows in one model call."""
+        with _ENCODE_LOCK:
+            embeddings = self._model.encode(
+                queries,
+                batch_size=len(queries),
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def _cached_query(self, query: str) -> np.ndarray | None:
+        """Return a cached query embedding and mark it recently used."""
+        cached = self._query_cache.get(query)
+        if cached is not None:
+            self._query_cache.move_to_end(query)
+        return cached
+
+    def _cache_query(self, query: str, embedding: np.ndarray) -> np.ndarray:
+        """Store a query embedding in the LRU cache and return it read-only."""
+        embedding.setflags(write=False)
+        self._query_cache[query] = embedding
+        if len(self._query_cache) > _QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return embedding
@@ -9,13 +9,13 @@ from contextlib import asynccontextmanager
 from typing import Any
 
 import anyio
-from mcp import types
+from mcp import ClientSession, types
 from mcp.server.lowlevel.server import Server as MCPServer
 from mcp.server.stdio import stdio_server
 
 from smartmcp.config import SmartMCPConfig
 from smartmcp.embedding import EmbeddingIndex
-from smartmcp.upstream import UpstreamManager, parse_prefixed_name
+from smartmcp.upstream import UpstreamManager, UpstreamTool, parse_prefixed_name
 
 logger = logging.getLogger(__name__)
 
@@ -96,13 +96,19 @@ class SmartMCPState:
         self,
         upstream: UpstreamManager,
         index: EmbeddingIndex,
-        all_tools: list[tuple[str, types.Tool]],
+        all_tools: list[UpstreamTool],
         config: SmartMCPConfig,
     ) -> None:
         self.upstream = upstream
         self.index = index
         self.all_tools = all_tools
         self.config = config
+        # Prefixed tool name -> (upstream session, original tool name), built
+        # once so proxied calls need a single dict lookup.
+        self.tool_route: dict[str, tuple[ClientSession, str]] = {
+            entry.tool.name: (upstream.sessions[entry.server], entry.original_name)
+            for entry in all_tools
+        }
 
 
 def list_static_tools(state: SmartMCPState) -> list[types.Tool]:
@@ -167,33 +173,21 @@ async def handle_call_discovered_tool(
             )
         ]
 
-    try:
-        server_name, original_name = parse_prefixed_name(target)
-    except ValueError:
+    route = state.tool_route.get(target)
+    if route is None:
         return [types.TextContent(type="text", text=f"Unknown target: {target}")]
-
-    upstream_session = state.upstream.sessions.get(server_name)
-    if not upstream_session:
-        return [
-            types.TextContent(
-                type="text",
-                text=f"No upstream server: {server_name}",
-            )
-        ]
+    upstream_session, original_name = route
 
     logger.info(
-        "Proxying call_discovered_tool target=%s -> %s on %s",
+        "Proxying call_discovered_tool target=%s -> %s",
         target,
         original_name,
-        server_name,
     )
     try:
         result = await upstream_session.call_tool(original_name, upstream_arguments)
         return list(result.content)
     except Exception as exc:
-        logger.error(
-            "Tool call failed: %s on %s: %s", original_name, server_name, exc
-        )
+        logger.error("Tool call failed: %s: %s", target, exc)
         return [
             types.TextContent(
                 type="text",
@@ -219,7 +213,7 @@ async def handle_search_tools(
         return [types.TextContent(type="text", text=json.dumps(payload, indent=2))]
 
     try:
-        results = state.index.search(query, top_k=top_k)
+        results = await state.index.search_async(query, top_k=top_k)
     except Exception as exc:
         logger.error("Search failed for query '%s': %s", query, exc)
         payload = {"error": f"Search error: {exc}", "matches": []}
@@ -248,9 +242,9 @@ def run_server(config: SmartMCPConfig) -> None:
             )
 
         raw_tools = await upstream.collect_tools()
-        tools_only = [tool for _, tool in raw_tools]
+        tools_only = [entry.tool for entry in raw_tools]
 
-        index = EmbeddingIndex(config.embedding_model)
+        index = EmbeddingIndex(config.embedding_model, config.embedding_backend)
         index.build_index(tools_only)
 
         logger.info("smartmcp ready — %d tools indexed from %d server(s)", len(tools_only), len(upstream.sessions))
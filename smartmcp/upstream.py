@@ -4,11 +4,15 @@ from __future__ import annotations
 
 import logging
 from contextlib import AsyncExitStack
+from typing import NamedTuple
+
+import anyio
+from anyio.abc import TaskStatus
 from mcp import ClientSession
 from mcp import types
 from mcp.client.stdio import StdioServerParameters, stdio_client
 
-from smartmcp.config import SmartMCPConfig
+from smartmcp.config import ServerConfig, SmartMCPConfig
 
 logger = logging.getLogger(__name__)
 
@@ -28,53 +32,101 @@ def parse_prefixed_name(prefixed: str) -> tuple[str, str]:
     return parts[0], parts[1]
 
 
+class UpstreamTool(NamedTuple):
+    """A tool collected from an upstream server, exposed under a prefixed name."""
+
+    server: str
+    tool: types.Tool
+    original_name: str
+
+
 class UpstreamManager:
     """Manages connections to upstream MCP servers."""
 
     def __init__(self) -> None:
         self._stack = AsyncExitStack()
+        self._shutdown: anyio.Event | None = None
         self.sessions: dict[str, ClientSession] = {}
 
     async def connect_all(self, config: SmartMCPConfig) -> list[str]:
         """Spawn and connect to all configured upstream MCP servers.
 
+        Servers are connected concurrently, so startup takes as long as the
+        slowest handshake rather than the sum of all of them.
+
         Returns a list of server names that failed to connect.
         """
-        failed: list[str] = []
-        for name, server_cfg in config.servers.items():
+        self._shutdown = anyio.Event()
+        # Each connection lives in its own task in this group until close(),
+        # because stdio_client must be exited from the task that entered it.
+        server_group = await self._stack.enter_async_context(anyio.create_task_group())
+
+        connected: dict[str, ClientSession] = {}
+
+        async def _connect(name: str, server_cfg: ServerConfig) -> None:
             try:
-                params = StdioServerParameters(
-                    command=server_cfg.command,
-                    args=server_cfg.args,
-                    env=server_cfg.env if server_cfg.env else None,
+                connected[name] = await server_group.start(
+                    self._run_session, name, server_cfg
                 )
-                transport = await self._stack.enter_async_context(stdio_client(params))
-                read_stream, write_stream = transport
-                session = await self._stack.enter_async_context(
-                    ClientSession(read_stream, write_stream)
-                )
-                await session.initialize()
-                self.sessions[name] = session
                 logger.info("Connected to upstream server: %s", name)
             except Exception as exc:
                 logger.warning("Failed to connect to server '%s': %s", name, exc)
-                failed.append(name)
+
+        async with anyio.create_task_group() as connect_group:
+            for name, server_cfg in config.servers.items():
+                connect_group.start_soon(_connect, name, server_cfg)
+
+        # Keep configuration order regardless of which handshake finished first.
+        self.sessions = {
+            name: connected[name] for name in config.servers if name in connected
+        }
+        failed = [name for name in config.servers if name not in connected]
 
         if not self.sessions:
+            await self.close()
             raise RuntimeError(
                 "All upstream servers failed to connect. Cannot start smartmcp."
             )
 
         return failed
 
-    async def collect_tools(self) -> list[tuple[str, types.Tool]]:
+    async def _run_session(
+        self,
+        name: str,
+        server_cfg: ServerConfig,
+        *,
+        task_status: TaskStatus[ClientSession] = anyio.TASK_STATUS_IGNORED,
+    ) -> None:
+        """Connect to one upstream server and hold the session open until close()."""
+        assert self._shutdown is not None
+        params = StdioServerParameters(
+            command=server_cfg.command,
+            args=server_cfg.args,
+            env=server_cfg.env if server_cfg.env else None,
+        )
+        started = False
+        try:
+            async with stdio_client(params) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    task_status.started(session)
+                    started = True
+                    await self._shutdown.wait()
+        except Exception as exc:
+            if not started:
+                raise
+            logger.warning("Upstream server '%s' disconnected: %s", name, exc)
+
+    async def collect_tools(self) -> list[UpstreamTool]:
         """Fetch tool schemas from all connected upstream servers.
 
         Tool names are prefixed with 'servername__' to avoid collisions.
-        Returns a list of (server_name, prefixed_tool) tuples.
+        Returns a list of (server_name, prefixed_tool, original_name) tuples.
         """
-        all_tools: list[tuple[str, types.Tool]] = []
-        for name, session in self.sessions.items():
+        names = list(self.sessions)
+        per_server: list[list[UpstreamTool]] = [[] for _ in names]
+
+        async def _collect(i: int, name: str, session: ClientSession) -> None:
             try:
                 result = await session.list_tools()
                 for tool in result.tools:
@@ -83,12 +135,20 @@ class UpstreamManager:
                         description=tool.description,
                         inputSchema=tool.inputSchema,
                     )
-                    all_tools.append((name, prefixed))
+                    per_server[i].append(UpstreamTool(name, prefixed, tool.name))
                 logger.info("Collected %d tool(s) from server: %s", len(result.tools), name)
             except Exception as exc:
                 logger.warning("Failed to collect tools from server '%s': %s", name, exc)
-        return all_tools
+
+        # Upstream servers are separate processes, so list them concurrently.
+        async with anyio.create_task_group() as tg:
+            for i, name in enumerate(names):
+                tg.start_soon(_collect, i, name, self.sessions[name])
+
+        return [entry for tools in per_server for entry in tools]
 
     async def close(self) -> None:
         """Shut down all upstream connections."""
+        if self._shutdown is not None:
+            self._shutdown.set()
         await self._stack.aclose()
@@ -0,0 +1,79 @@
+"""Tests for ``load_config`` parsing and validation."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+
+from smartmcp.config import ServerConfig, load_config
+
+
+class LoadConfigTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def _write(self, data: Any) -> Path:
+        path = Path(self._tmp.name) / "smartmcp.json"
+        path.write_text(json.dumps(data))
+        return path
+
+    def test_parses_servers_and_applies_defaults(self) -> None:
+        path = self._write(
+            {
+                "mcpServers": {
+                    "github": {
+                        "command": "npx",
+                        "args": ["-y", "@modelcontextprotocol/server-github"],
+                        "env": {"GITHUB_TOKEN": "token"},
+                    },
+                    "memory": {"command": "mcp-memory"},
+                },
+                "top_k": 3,
+            }
+        )
+
+        config = load_config(path)
+
+        self.assertEqual(
+            config.servers["github"],
+            ServerConfig(
+                command="npx",
+                args=["-y", "@modelcontextprotocol/server-github"],
+                env={"GITHUB_TOKEN": "token"},
+            ),
+        )
+        self.assertEqual(config.servers["memory"], ServerConfig(command="mcp-memory"))
+        self.assertEqual(config.top_k, 3)
+        self.assertEqual(config.embedding_model, "all-MiniLM-L6-v2")
+        self.assertEqual(config.embedding_backend, "torch")
+
+    def test_rejects_missing_or_empty_servers(self) -> None:
+        for data in ({}, {"mcpServers": {}}):
+            with self.assertRaisesRegex(ValueError, "non-empty 'mcpServers'"):
+                load_config(self._write(data))
+
+    def test_rejects_server_without_command(self) -> None:
+        path = self._write({"mcpServers": {"github": {"args": []}}})
+
+        with self.assertRaisesRegex(ValueError, "Server 'github'.*`command`"):
+            load_config(path)
+
+    def test_rejects_unknown_embedding_backend(self) -> None:
+        path = self._write(
+            {"mcpServers": {"memory": {"command": "mcp-memory"}}, "embedding_backend": "tpu"}
+        )
+
+        with self.assertRaisesRegex(ValueError, "embedding_backend"):
+            load_config(path)
+
+    def test_missing_file_raises_file_not_found(self) -> None:
+        with self.assertRaises(FileNotFoundError):
+            load_config(Path(self._tmp.name) / "missing.json")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""Tests for CPU availability detection against canned procfs/cgroup files."""
+
+from __future__ import annotations
+
+import io
+import unittest
+from unittest import mock
+
+from smartmcp import cpu
+
+# Two physical cores with two SMT threads each, as x86 reports them.
+_X86_CPUINFO = "\n\n".join(
+    f"processor\t: {n}\nphysical id\t: 0\ncore id\t\t: {n % 2}\nsiblings\t: 4"
+    for n in range(4)
+)
+
+# ARM kernels omit physical id and core id entirely.
+_ARM_CPUINFO = "\n\n".join(f"processor\t: {n}\nBogoMIPS\t: 50.00" for n in range(4))
+
+
+def _patch_files(files: dict[str, str]) -> mock._patch:
+    """Serve ``files`` from ``open`` in ``smartmcp.cpu``; other paths are missing."""
+
+    def _open(path: str, *args: object, **kwargs: object) -> io.StringIO:
+        if path not in files:
+            raise FileNotFoundError(path)
+        return io.StringIO(files[path])
+
+    return mock.patch.object(cpu, "open", side_effect=_open, create=True)
+
+
+class UsableCpuCountTest(unittest.TestCase):
+    def _count(self, files: dict[str, str], allowed: set[int]) -> int | None:
+        with _patch_files(files), mock.patch.object(
+            cpu.os, "sched_getaffinity", return_value=allowed, create=True
+        ):
+            return cpu.usable_cpu_count()
+
+    def test_counts_smt_siblings_once(self) -> None:
+        count = self._count({"/proc/cpuinfo": _X86_CPUINFO}, {0, 1, 2, 3})
+
+        self.assertEqual(count, 2)
+
+    def test_ignores_cpus_outside_affinity_mask(self) -> None:
+        count = self._count({"/proc/cpuinfo": _X86_CPUINFO}, {0, 2})
+
+        self.assertEqual(count, 1)
+
+    def test_counts_each_processor_without_core_topology(self) -> None:
+        count = self._count({"/proc/cpuinfo": _ARM_CPUINFO}, {0, 1, 2})
+
+        self.assertEqual(count, 3)
+
+    def test_falls_back_to_affinity_mask_when_cpuinfo_unreadable(self) -> None:
+        count = self._count({}, {0, 1, 2, 3, 4, 5})
+
+        self.assertEqual(count, 6)
+
+    def test_caps_count_at_cgroup_quota(self) -> None:
+        files = {"/proc/cpuinfo": _ARM_CPUINFO, "/sys/fs/cgroup/cpu.max": "150000 100000\n"}
+
+        self.assertEqual(self._count(files, {0, 1, 2, 3}), 2)
+
+    def test_returns_none_without_affinity_support(self) -> None:
+        with mock.patch.object(cpu, "os", spec=[]):
+            self.assertIsNone(cpu.usable_cpu_count())
+
+
+class CgroupCpuQuotaTest(unittest.TestCase):
+    def _quota(self, files: dict[str, str]) -> int | None:
+        with _patch_files(files):
+            return cpu.cgroup_cpu_quota()
+
+    def test_reads_cgroup_v2_quota(self) -> None:
+        self.assertEqual(self._quota({"/sys/fs/cgroup/cpu.max": "200000 100000\n"}), 2)
+
+    def test_rounds_fractional_quota_up(self) -> None:
+        self.assertEqual(self._quota({"/sys/fs/cgroup/cpu.max": "50000 100000\n"}), 1)
+
+    def test_unlimited_cgroup_v2_quota_is_none(self) -> None:
+        self.assertIsNone(self._quota({"/sys/fs/cgroup/cpu.max": "max 100000\n"}))
+
+    def test_falls_back_to_cgroup_v1_quota(self) -> None:
+        files = {
+            "/sys/fs/cgroup/cpu/cpu.cfs_quota_us": "300000\n",
+            "/sys/fs/cgroup/cpu/cpu.cfs_period_us": "100000\n",
+        }
+
+        self.assertEqual(self._quota(files), 3)
+
+    def test_unlimited_cgroup_v1_quota_is_none(self) -> None:
+        files = {
+            "/sys/fs/cgroup/cpu/cpu.cfs_quota_us": "-1\n",
+            "/sys/fs/cgroup/cpu/cpu.cfs_period_us": "100000\n",
+        }
+
+        self.assertIsNone(self._quota(files))
+
+    def test_unreadable_files_are_none(self) -> None:
+        self.assertIsNone(self._quota({}))
+
+    def test_malformed_quota_is_none(self) -> None:
+        self.assertIsNone(self._quota({"/sys/fs/cgroup/cpu.max": "max\n"}))
+        self.assertIsNone(self._quota({"/sys/fs/cgroup/cpu.max": "100000 0\n"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
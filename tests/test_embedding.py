@@ -0,0 +1,309 @@
+"""Tests for ``EmbeddingIndex`` using a deterministic stand-in model."""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from typing import Any
+from unittest import mock
+
+import anyio
+import numpy as np
+from mcp import types
+
+from smartmcp import embedding
+from smartmcp.embedding import EmbeddingIndex, tool_to_text
+
+
+class _FakeModel:
+    """Embeds text as word counts over a small fixed vocabulary.
+
+    Records every ``encode`` call so tests can inspect batching behavior.
+    """
+
+    device = SimpleNamespace(type="cpu")
+
+    def __init__(self, vocab: list[str]) -> None:
+        self._vocab = vocab
+        self.calls: list[tuple[list[str], dict[str, Any]]] = []
+
+    def encode(self, texts: list[str], **kwargs: Any) -> np.ndarray:
+        self.calls.append((list(texts), kwargs))
+        rows = []
+        for text in texts:
+            words = text.lower().split()
+            rows.append([float(words.count(v)) + 0.01 for v in self._vocab])
+        embeddings = np.asarray(rows, dtype=np.float32)
+        if kwargs.get("normalize_embeddings"):
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings
+
+
+_VOCAB = ["issue", "file", "message", "calendar"]
+
+
+def _tools() -> list[types.Tool]:
+    return [
+        types.Tool(
+            name="github__create_issue",
+            description="Create a new issue in a GitHub repository issue tracker",
+            inputSchema={"type": "object", "properties": {}},
+        ),
+        types.Tool(
+            name="filesystem__read_file",
+            description="Read a file",
+            inputSchema={"type": "object", "properties": {}},
+        ),
+        types.Tool(
+            name="slack__post_message",
+            description="Post a message to a Slack channel so the team sees the message",
+            inputSchema={"type": "object", "properties": {}},
+        ),
+        types.Tool(
+            name="google__create_event",
+            description="Add a calendar event",
+            inputSchema={"type": "object", "properties": {}},
+        ),
+    ]
+
+
+def _build_index() -> tuple[EmbeddingIndex, _FakeModel]:
+    model = _FakeModel(_VOCAB)
+    with mock.patch.object(embedding, "SentenceTransformer", return_value=model):
+        index = EmbeddingIndex("fake-model")
+    index.build_index(_tools())
+    return index, model
+
+
+class ToolToTextTest(unittest.TestCase):
+    def test_includes_name_description_and_parameters(self) -> None:
+        tool = types.Tool(
+            name="github__create_issue",
+            description="Create a GitHub issue",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "repo_name": {"type": "string", "description": "owner/repo"},
+                    "issue_body": {"type": "string"},
+                },
+            },
+        )
+
+        self.assertEqual(
+            tool_to_text(tool),
+            "github  create issue Create a GitHub issue "
+            "repo name: owner/repo issue body",
+        )
+
+    def test_tolerates_missing_description_and_properties(self) -> None:
+        tool = types.Tool(name="memory__clear", inputSchema={"type": "object"})
+
+        self.assertEqual(tool_to_text(tool), "memory  clear")
+
+
+class ConfigureTorchThreadsTest(unittest.TestCase):
+    def _configure(self, *, current: int, usable: int | None) -> mock.MagicMock:
+        with mock.patch.object(
+            embedding.torch, "get_num_threads", return_value=current
+        ), mock.patch.object(
+            embedding, "usable_cpu_count", return_value=usable
+        ), mock.patch.object(embedding.torch, "set_num_threads") as set_threads:
+            embedding._configure_torch_threads.__wrapped__()
+        return set_threads
+
+    def test_sizes_pool_to_usable_cpus(self) -> None:
+        default = embedding._TORCH_DEFAULT_THREADS
+        with mock.patch.dict(embedding.os.environ, clear=True):
+            set_threads = self._configure(current=default, usable=default + 2)
+
+        set_threads.assert_called_once_with(default + 2)
+
+    def test_respects_thread_environment_variables(self) -> None:
+        default = embedding._TORCH_DEFAULT_THREADS
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            with mock.patch.dict(embedding.os.environ, {var: "2"}, clear=True):
+                set_threads = self._configure(current=default, usable=default + 2)
+            set_threads.assert_not_called()
+
+    def test_respects_thread_count_already_set(self) -> None:
+        default = embedding._TORCH_DEFAULT_THREADS
+        with mock.patch.dict(embedding.os.environ, clear=True):
+            set_threads = self._configure(current=default + 1, usable=default + 2)
+
+        set_threads.assert_not_called()
+
+
+class EmbeddingIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        embedding._load_model.cache_clear()
+
+    def test_build_index_encodes_into_contiguous_float32_matrix(self) -> None:
+        index, model = _build_index()
+
+        _, kwargs = model.calls[0]
+        self.assertEqual(index._matrix.dtype, np.float32)
+        self.assertTrue(index._matrix.flags["C_CONTIGUOUS"])
+        self.assertEqual(kwargs["batch_size"], embedding._CPU_BATCH_SIZE)
+        self.assertFalse(kwargs["show_progress_bar"])
+        self.assertTrue(kwargs["normalize_embeddings"])
+
+    def test_search_results_stay_aligned_with_tools(self) -> None:
+        index, _ = _build_index()
+
+        expected = {
+            "open an issue": "github__create_issue",
+            "read a file": "filesystem__read_file",
+            "send a message": "slack__post_message",
+            "schedule a calendar meeting": "google__create_event",
+        }
+        for query, tool_name in expected.items():
+            results = index.search(query, top_k=1)
+            self.assertEqual(results[0][0].name, tool_name, query)
+
+    def test_search_returns_all_tools_sorted_when_top_k_exceeds_catalog(self) -> None:
+        index, _ = _build_index()
+
+        results = index.search("post a message", top_k=10)
+
+        self.assertEqual(len(results), len(_tools()))
+        scores = [score for _, score in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(results[0][0].name, "slack__post_message")
+
+    def test_search_with_non_positive_top_k_returns_nothing(self) -> None:
+        index, _ = _build_index()
+
+        self.assertEqual(index.search("read a file", top_k=0), [])
+        self.assertEqual(index.search("read a file", top_k=-2), [])
+
+    def test_repeated_query_reuses_cached_embedding(self) -> None:
+        index, model = _build_index()
+        calls_after_build = len(model.calls)
+
+        first = index.search("read a file", top_k=2)
+        second = index.search("read a file", top_k=2)
+
+        self.assertEqual(len(model.calls), calls_after_build + 1)
+        self.assertEqual(first, second)
+
+    def test_indexes_share_a_loaded_model(self) -> None:
+        with mock.patch.object(
+            embedding, "SentenceTransformer", side_effect=lambda _: _FakeModel(_VOCAB)
+        ) as loader:
+            first = EmbeddingIndex("fake-model")
+            second = EmbeddingIndex("fake-model")
+
+        loader.assert_called_once_with("fake-model")
+        self.assertIs(first._model, second._model)
+
+    def test_onnx_backend_falls_back_to_torch_when_unavailable(self) -> None:
+        model = _FakeModel(_VOCAB)
+
+        with mock.patch.object(
+            embedding.importlib.util, "find_spec", return_value=None
+        ), mock.patch.object(
+            embedding, "SentenceTransformer", return_value=model
+        ) as loader:
+            index = EmbeddingIndex("fake-model", backend="onnx")
+
+        self.assertIs(index._model, model)
+        loader.assert_called_once_with("fake-model")
+
+    def test_onnx_backend_falls_back_to_torch_when_loading_fails(self) -> None:
+        def _load(model_name: str, **kwargs: Any) -> _FakeModel:
+            if kwargs.get("backend") == "onnx":
+                # What sentence-transformers raises when optimum is missing.
+                raise Exception(
+                    "Using the ONNX backend requires installing Optimum and "
+                    "ONNX Runtime."
+                )
+            return _FakeModel(_VOCAB)
+
+        with mock.patch.object(
+            embedding, "_onnx_available", return_value=True
+        ), mock.patch.object(
+            embedding, "SentenceTransformer", side_effect=_load
+        ) as loader:
+            onnx_index = EmbeddingIndex("fake-model", backend="onnx")
+            torch_index = EmbeddingIndex("fake-model", backend="torch")
+
+        self.assertIs(onnx_index._model, torch_index._model)
+        self.assertEqual(
+            loader.call_args_list,
+            [mock.call("fake-model", backend="onnx"), mock.call("fake-model")],
+        )
+
+
+class EmbeddingIndexAsyncTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        embedding._load_model.cache_clear()
+
+    async def test_concurrent_queries_share_one_encode(self) -> None:
+        index, model = _build_index()
+        calls_after_build = len(model.calls)
+
+        file_results, message_results = await asyncio.gather(
+            index.search_async("read a file", top_k=1),
+            index.search_async("send a message", top_k=1),
+        )
+
+        self.assertEqual(len(model.calls), calls_after_build + 1)
+        batched_queries, _ = model.calls[-1]
+        self.assertEqual(sorted(batched_queries), ["read a file", "send a message"])
+        self.assertEqual(file_results[0][0].name, "filesystem__read_file")
+        self.assertEqual(message_results[0][0].name, "slack__post_message")
+
+    async def test_cancelling_leader_does_not_fail_batched_queries(self) -> None:
+        index, model = _build_index()
+        calls_after_build = len(model.calls)
+        follower_results: list[tuple[types.Tool, float]] = []
+
+        async def _leader(scope: anyio.CancelScope) -> None:
+            with scope:
+                await index.search_async("read a file", top_k=1)
+
+        async def _follower() -> None:
+            follower_results.extend(
+                await index.search_async("send a message", top_k=1)
+            )
+
+        leader_scope = anyio.CancelScope()
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(_leader, leader_scope)
+            await anyio.sleep(0)
+            tg.start_soon(_follower)
+            await anyio.sleep(0.001)
+            leader_scope.cancel()
+
+        self.assertEqual(follower_results[0][0].name, "slack__post_message")
+        batched_queries, _ = model.calls[calls_after_build]
+        self.assertEqual(sorted(batched_queries), ["read a file", "send a message"])
+
+    async def test_batched_query_failure_reports_the_cause(self) -> None:
+        index, model = _build_index()
+        model.encode = mock.Mock(side_effect=MemoryError("out of memory"))
+
+        leader, follower = await asyncio.gather(
+            index.search_async("read a file", top_k=1),
+            index.search_async("send a message", top_k=1),
+            return_exceptions=True,
+        )
+
+        self.assertIsInstance(leader, MemoryError)
+        self.assertIsInstance(follower, RuntimeError)
+        self.assertEqual(str(follower), "Query encoding failed: out of memory")
+        self.assertIs(follower.__cause__, leader)
+
+    async def test_async_search_matches_sync_search(self) -> None:
+        index, _ = _build_index()
+
+        async_results = await index.search_async("schedule a calendar event", top_k=2)
+        index._query_cache.clear()
+        sync_results = index.search("schedule a calendar event", top_k=2)
+
+        self.assertEqual(async_results, sync_results)
+
+
+if __name__ == "__main__":
+    unittest.main()
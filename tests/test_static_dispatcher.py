@@ -31,6 +31,7 @@ from smartmcp.server import (
     handle_search_tools,
     list_static_tools,
 )
+from smartmcp.upstream import UpstreamTool
 
 
 class _FakeIndex:
@@ -39,7 +40,9 @@ class _FakeIndex:
     def __init__(self, tools: list[types.Tool]) -> None:
         self._tools = tools
 
-    def search(self, query: str, top_k: int = 5) -> list[tuple[types.Tool, float]]:
+    async def search_async(
+        self, query: str, top_k: int = 5
+    ) -> list[tuple[types.Tool, float]]:
         return [(tool, 0.9) for tool in self._tools[:top_k]]
 
 
@@ -86,7 +89,7 @@ def _build_state() -> tuple[SmartMCPState, _FakeSession]:
     state = SmartMCPState(
         upstream=upstream,  # type: ignore[arg-type]
         index=index,  # type: ignore[arg-type]
-        all_tools=[("github", upstream_tool)],
+        all_tools=[UpstreamTool("github", upstream_tool, "create_issue")],
         config=config,
     )
     return state, session
@@ -133,6 +136,17 @@ class StaticDispatcherEndToEndTest(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(call_result), 1)
         self.assertIn("called create_issue", call_result[0].text)
 
+    async def test_call_discovered_tool_rejects_unknown_target(self) -> None:
+        state, session = _build_state()
+
+        call_result = await handle_call_discovered_tool(
+            state,
+            {"target": "github__delete_repo", "arguments": {}},
+        )
+
+        self.assertEqual(session.calls, [])
+        self.assertIn("Unknown target: github__delete_repo", call_result[0].text)
+
 
 if __name__ == "__main__":
     unittest.main()